@@ -1,7 +1,9 @@
 """DAG builder and topological sort for scope-based tasks."""
 
+import heapq
+from array import array
 from collections import defaultdict, deque
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 
 from kitdag.core.task import Task
 
@@ -21,6 +23,7 @@ class DAGBuilder:
         self._deps: Dict[str, Set[str]] = defaultdict(set)
         self._rdeps: Dict[str, Set[str]] = defaultdict(set)
         self._all_tasks: Dict[str, Task] = {}
+        self._full_graph = None  # memoized _indexed_graph(None) result
 
     def add_tasks(self, tasks: List[Task]) -> None:
         """Register tasks as nodes in the graph."""
@@ -28,6 +31,7 @@ class DAGBuilder:
             self._all_tasks[t.id] = t
             if t.id not in self._deps:
                 self._deps[t.id] = set()
+        self._full_graph = None
 
     def set_edges(self, edges: Dict[str, Set[str]]) -> None:
         """Set dependency edges (task_id -> set of dependency task_ids)."""
@@ -39,34 +43,142 @@ class DAGBuilder:
                     continue
                 self._deps[tid].add(dep_id)
                 self._rdeps[dep_id].add(tid)
+        self._full_graph = None
 
-    def topological_sort(self) -> List[str]:
+    def topological_sort(
+        self,
+        subset: Optional[Set[str]] = None,
+        priorities: Optional[Dict[str, float]] = None,
+    ) -> List[str]:
         """Return task IDs in dependency-respecting execution order.
 
-        Uses Kahn's algorithm. Raises CyclicDependencyError if cycle detected.
+        Uses Kahn's algorithm over an integer-indexed adjacency list:
+        node IDs are hashed once to assign indices, after which the inner
+        loop touches only a flat in-degree array and int successor lists.
+        Raises CyclicDependencyError if a cycle is detected.
+
+        Args:
+            subset: if given, sort only these task IDs. Edges from tasks
+                outside the subset are treated as already satisfied, so
+                incremental runs can sort just the pending subgraph
+                instead of the whole DAG.
+            priorities: if given, ready tasks are emitted highest
+                priority first (e.g. critical-path lengths from
+                critical_path_lengths()) so long chains start early.
         """
-        in_degree: Dict[str, int] = {}
-        for tid in self._all_tasks:
-            in_degree[tid] = len(self._deps.get(tid, set()))
-
-        queue = deque(tid for tid, deg in in_degree.items() if deg == 0)
-        result: List[str] = []
-
-        while queue:
-            tid = queue.popleft()
-            result.append(tid)
-            for dependent in self._rdeps.get(tid, set()):
-                in_degree[dependent] -= 1
-                if in_degree[dependent] == 0:
-                    queue.append(dependent)
-
-        if len(result) != len(self._all_tasks):
-            missing = set(self._all_tasks) - set(result)
+        ids, indptr, indices, in_degree = self._indexed_graph(subset)
+        n = len(ids)
+
+        order: List[int] = []
+        if priorities is None:
+            queue = deque(i for i in range(n) if in_degree[i] == 0)
+            while queue:
+                u = queue.popleft()
+                order.append(u)
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    in_degree[v] -= 1
+                    if in_degree[v] == 0:
+                        queue.append(v)
+        else:
+            # Max-heap on priority (heapq is a min-heap, hence negation);
+            # index as tiebreak keeps the order deterministic.
+            heap = [
+                (-priorities.get(ids[i], 0.0), i)
+                for i in range(n) if in_degree[i] == 0
+            ]
+            heapq.heapify(heap)
+            while heap:
+                _, u = heapq.heappop(heap)
+                order.append(u)
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    in_degree[v] -= 1
+                    if in_degree[v] == 0:
+                        heapq.heappush(
+                            heap, (-priorities.get(ids[v], 0.0), v)
+                        )
+
+        if len(order) != n:
+            sorted_set = set(order)
+            missing = {ids[i] for i in range(n) if i not in sorted_set}
             raise CyclicDependencyError(
                 f"Cycle detected involving tasks: {missing}"
             )
 
-        return result
+        return [ids[i] for i in order]
+
+    def _indexed_graph(self, subset: Optional[Set[str]] = None):
+        """Build the integer-indexed adjacency in CSR form.
+
+        Returns (ids, indptr, indices, in_degree): node IDs in insertion
+        order, the successors of node ``u`` as
+        ``indices[indptr[u]:indptr[u+1]]``, and a flat in-degree array.
+        The two int arrays keep every edge in contiguous memory, so the
+        Kahn walks stream through them without chasing per-node list
+        objects. Edges from nodes outside ``subset`` (when given) are
+        omitted.
+
+        The full-graph form is memoized (invalidated by add_tasks /
+        set_edges) since sorts, stage grouping and critical-path
+        computation all rebuild the same structure; callers get a fresh
+        in-degree copy because the walks consume it.
+        """
+        if subset is None:
+            if self._full_graph is None:
+                self._full_graph = self._build_indexed_graph(None)
+            ids, indptr, indices, in_degree = self._full_graph
+            return ids, indptr, indices, array("i", in_degree)
+        return self._build_indexed_graph(subset)
+
+    def _build_indexed_graph(self, subset: Optional[Set[str]]):
+        if subset is None:
+            ids = list(self._all_tasks)
+        else:
+            ids = [tid for tid in self._all_tasks if tid in subset]
+
+        index = {tid: i for i, tid in enumerate(ids)}
+        n = len(ids)
+        successors: List[List[int]] = [[] for _ in range(n)]
+        in_degree = array("i", [0]) * n
+
+        for i, tid in enumerate(ids):
+            for dep in self._deps.get(tid, ()):
+                j = index.get(dep)
+                if j is not None:
+                    successors[j].append(i)
+                    in_degree[i] += 1
+
+        # Flatten to CSR: one contiguous indices array plus offsets.
+        indptr = array("i", [0])
+        indices = array("i")
+        for succ in successors:
+            indices.extend(succ)
+            indptr.append(len(indices))
+
+        return ids, indptr, indices, in_degree
+
+    def critical_path_lengths(
+        self, durations: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Compute each task's critical-path length to any sink.
+
+        cpl(t) = duration(t) + max(cpl of t's dependents), i.e. the total
+        remaining work on the longest downstream chain. Feeding these
+        into topological_sort(priorities=...) yields a list-scheduling
+        order that starts long chains first.
+
+        Args:
+            durations: task_id -> relative duration (missing IDs count
+                as 1.0).
+        """
+        cpl: Dict[str, float] = {}
+        for tid in reversed(self.topological_sort()):
+            downstream = max(
+                (cpl[d] for d in self._rdeps.get(tid, ())), default=0.0
+            )
+            cpl[tid] = durations.get(tid, 1.0) + downstream
+        return cpl
 
     def get_dependencies(self, task_id: str) -> Set[str]:
         """Get direct dependencies of a task."""
@@ -86,21 +198,20 @@ class DAGBuilder:
         Each stage contains tasks that can run in parallel.
         Stage N+1 tasks depend only on stage <= N tasks.
         """
-        in_degree: Dict[str, int] = {}
-        for tid in self._all_tasks:
-            in_degree[tid] = len(self._deps.get(tid, set()))
+        ids, indptr, indices, in_degree = self._indexed_graph()
 
-        current = [tid for tid, deg in in_degree.items() if deg == 0]
+        current = [i for i in range(len(ids)) if in_degree[i] == 0]
         stages: List[List[str]] = []
 
         while current:
-            stages.append(sorted(current))
-            next_stage: List[str] = []
-            for tid in current:
-                for dependent in self._rdeps.get(tid, set()):
-                    in_degree[dependent] -= 1
-                    if in_degree[dependent] == 0:
-                        next_stage.append(dependent)
+            stages.append(sorted(ids[i] for i in current))
+            next_stage: List[int] = []
+            for u in current:
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    in_degree[v] -= 1
+                    if in_degree[v] == 0:
+                        next_stage.append(v)
             current = next_stage
 
         return stages
@@ -177,6 +177,7 @@ class Flow:
             tasks=tasks,
             dag=dag,
             output_root=output_root,
+            task_index=task_index,
         )
 
     def _make_task(
@@ -213,7 +214,12 @@ class Flow:
         task_index: "_TaskIndex",
         edges: Dict[str, Set[str]],
     ) -> None:
-        """Resolve a dependency declaration into concrete task edges."""
+        """Resolve a dependency declaration into concrete task edges.
+
+        Upstream tasks are looked up through the (step, lib[, branch])
+        buckets of the task index rather than scanned linearly, so
+        resolution is O(edges) instead of O(downstream × upstream).
+        """
         # Find all downstream tasks for this dep
         downstream_tasks = task_index.by_step.get(dep.downstream, [])
 
@@ -232,29 +238,21 @@ class Flow:
                 # Downstream has no branch → fan-in: all upstream branches
                 needed_branches = None  # means "all"
 
-            # Find matching upstream tasks
-            upstream_tasks = task_index.by_step.get(dep.upstream, [])
-            for us_task in upstream_tasks:
-                # Never create self-edges
-                if us_task.id == ds_task.id:
-                    continue
-
-                us_lib = us_task.scope.get("lib", "")
-                us_branch = us_task.scope.get("branch", "")
-
-                # Must match on lib
-                if us_lib != ds_lib:
-                    continue
+            if needed_branches is None:
+                # Fan-in: every upstream task of this lib, any branch
+                candidates = task_index.by_lib_step.get(
+                    (ds_lib, dep.upstream), []
+                )
+            else:
+                candidates = []
+                for branch in needed_branches:
+                    candidates.extend(task_index.by_step_lib_branch.get(
+                        (dep.upstream, ds_lib, branch), []
+                    ))
 
-                # Branch matching
-                if needed_branches is None:
-                    # Fan-in: accept all branches of this lib
-                    edges[ds_task.id].add(us_task.id)
-                elif us_branch in needed_branches:
-                    # Specific branch match
-                    edges[ds_task.id].add(us_task.id)
-                elif not us_branch and not ds_branch:
-                    # Both per-lib, no branch → match
+            for us_task in candidates:
+                # Never create self-edges
+                if us_task.id != ds_task.id:
                     edges[ds_task.id].add(us_task.id)
 
     # ------------------------------------------------------------------
@@ -431,39 +429,48 @@ class Pipeline:
         tasks: Dict[str, Task],
         dag: "DAGBuilder",
         output_root: str,
+        task_index: "Optional[_TaskIndex]" = None,
     ):
         self.name = name
         self.flow = flow
         self.tasks = tasks
         self.dag = dag
         self.output_root = output_root
+        # Reuse the index built during dependency resolution — the task
+        # set is fixed after build(), so its buckets stay valid.
+        self._task_index = task_index or _build_task_index(tasks)
+        self._libs: Optional[List[str]] = None
 
     @property
     def libs(self) -> List[str]:
-        """Unique libs in this pipeline."""
-        seen = []
-        seen_set = set()
-        for t in self.tasks.values():
-            lib = t.scope.get("lib", "")
-            if lib and lib not in seen_set:
-                seen.append(lib)
-                seen_set.add(lib)
-        return seen
+        """Unique libs in this pipeline.
+
+        Computed lazily and cached — the task set is fixed after build()
+        and callers (GUI refresh, engine) query this repeatedly.
+        """
+        if self._libs is None:
+            seen = []
+            seen_set = set()
+            for t in self.tasks.values():
+                lib = t.scope.get("lib", "")
+                if lib and lib not in seen_set:
+                    seen.append(lib)
+                    seen_set.add(lib)
+            self._libs = seen
+        return self._libs
 
     def tasks_for_lib(self, lib: str) -> Dict[str, Task]:
         """Return all tasks for a given lib."""
-        return {
-            tid: t for tid, t in self.tasks.items()
-            if t.scope.get("lib") == lib
-        }
+        return {t.id: t for t in self._task_index.by_lib.get(lib, [])}
 
     def get_task(self, step_name: str, lib: str, branch: str = "") -> Optional[Task]:
         """Look up a specific task by step/lib/branch."""
-        scope = {"lib": lib}
+        # Format the ID directly instead of building a throwaway Task
         if branch:
-            scope["branch"] = branch
-        task = Task(step_name=step_name, scope=scope)
-        return self.tasks.get(task.id)
+            tid = f"{step_name}/branch={branch}/lib={lib}"
+        else:
+            tid = f"{step_name}/lib={lib}"
+        return self.tasks.get(tid)
 
 
 # ------------------------------------------------------------------
@@ -475,7 +482,11 @@ class _TaskIndex:
     """Index for fast task lookup during dependency resolution."""
 
     by_step: Dict[str, List[Task]] = field(default_factory=dict)
+    by_lib: Dict[str, List[Task]] = field(default_factory=dict)
     by_lib_step: Dict[Tuple[str, str], List[Task]] = field(default_factory=dict)
+    by_step_lib_branch: Dict[Tuple[str, str, str], List[Task]] = field(
+        default_factory=dict
+    )
 
 
 def _build_task_index(tasks: Dict[str, Task]) -> _TaskIndex:
@@ -483,7 +494,12 @@ def _build_task_index(tasks: Dict[str, Task]) -> _TaskIndex:
     for task in tasks.values():
         idx.by_step.setdefault(task.step_name, []).append(task)
         lib = task.scope.get("lib", "")
+        branch = task.scope.get("branch", "")
+        idx.by_lib.setdefault(lib, []).append(task)
         idx.by_lib_step.setdefault((lib, task.step_name), []).append(task)
+        idx.by_step_lib_branch.setdefault(
+            (task.step_name, lib, branch), []
+        ).append(task)
     return idx
 
 
@@ -74,6 +74,15 @@ class Step(ABC):
         """
         return []
 
+    def estimate_duration(self) -> float:
+        """Relative duration estimate used for critical-path scheduling.
+
+        Override to hint the engine that this step's tasks are long
+        (e.g. return 10.0 for characterization vs 1.0 for packaging).
+        Only the ratio between steps matters.
+        """
+        return 1.0
+
     def get_log_error_patterns(self) -> List[str]:
         """Extra regex patterns to scan for in log files."""
         return []
@@ -8,6 +8,7 @@ Status model:
   Layer 2: per-variant output detail (e.g., per-PVT output products)
 """
 
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, List
@@ -23,7 +24,7 @@ class TaskStatus(Enum):
     SKIP = "SKIP"
 
 
-@dataclass
+@dataclass(slots=True)
 class VariantDetail:
     """Per-variant output check result (layer 2).
 
@@ -40,12 +41,17 @@ class VariantDetail:
         return f"VariantDetail({self.variant}/{self.product}, {status})"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """One concrete execution unit: step + scope.
 
     Layer 1: task-level status (PASS/FAIL/PENDING/RUNNING)
     Layer 2: per-variant output detail in variant_details
+
+    Instances use __slots__ (no per-instance __dict__) since large
+    libraries expand into many thousands of tasks. The ID is computed
+    once at construction — step_name and scope are never mutated after
+    creation — so hot loops keyed on task.id don't re-format strings.
     """
 
     step_name: str
@@ -56,16 +62,25 @@ class Task:
     input_hash: str = ""
     error_message: str = ""
     variant_details: List[VariantDetail] = field(default_factory=list)
+    _id: str = field(init=False, repr=False, compare=False, default="")
+
+    def __post_init__(self) -> None:
+        # Intern step_name and the ID: tasks for the same step share one
+        # string object, and interned IDs make the many dict/set lookups
+        # keyed on task.id hash-by-pointer hits.
+        self.step_name = sys.intern(self.step_name)
+        if self.scope:
+            scope_str = "/".join(
+                f"{k}={v}" for k, v in sorted(self.scope.items())
+            )
+            self._id = sys.intern(f"{self.step_name}/{scope_str}")
+        else:
+            self._id = self.step_name
 
     @property
     def id(self) -> str:
         """Unique ID: step_name or step_name/k1=v1/k2=v2."""
-        if not self.scope:
-            return self.step_name
-        scope_str = "/".join(
-            f"{k}={v}" for k, v in sorted(self.scope.items())
-        )
-        return f"{self.step_name}/{scope_str}"
+        return self._id
 
     @property
     def lib(self) -> str:
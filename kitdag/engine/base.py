@@ -13,7 +13,8 @@ import json
 import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Set
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
 
 from kitdag.core.dag import DAGBuilder
 from kitdag.core.flow import Flow, Pipeline
@@ -44,12 +45,20 @@ class BaseEngine(ABC):
         pipeline: Pipeline,
         get_inputs,
         max_retries: int = DEFAULT_AUTO_RETRIES,
+        persist_state: bool = True,
     ):
         self.pipeline = pipeline
         self.get_inputs = get_inputs
         self.max_retries = max_retries
-        self.state = StateManager(work_dir=pipeline.output_root)
+        # persist_state=False keeps all state in memory — one-shot runs
+        # (e.g. CI) skip loading and writing incremental state entirely.
+        self.state = StateManager(
+            work_dir=pipeline.output_root, persist=persist_state,
+        )
         self._tasks = pipeline.tasks
+        self._dirs_created: Set[str] = set()
+        self._cpl: Optional[Dict[str, float]] = None
+        self._inputs_cache: Dict[tuple, Dict[str, Any]] = {}
 
     @abstractmethod
     def _execute_task(self, task: Task, step: Step, inputs: Dict[str, Any]) -> bool:
@@ -71,40 +80,47 @@ class BaseEngine(ABC):
         # 3. Cascade invalidation
         self._cascade_invalidation()
 
+        # One status pass feeds both the fast path and the first attempt:
+        # after reconcile/cascade every task is PENDING, PASS or SKIP.
+        pending = [
+            tid for tid, t in self._tasks.items()
+            if t.status in (TaskStatus.PENDING, TaskStatus.FAIL)
+        ]
+
+        # Fast path: fully cached incremental run. Every task is PASS or
+        # SKIP with matching hashes, so the saved snapshot is already
+        # up to date — skip the state rewrite and the dispatch machinery.
+        if not pending:
+            logger.info("All %d tasks up to date, nothing to do",
+                        len(self._tasks))
+            return True
+
         # 4. Save initial state
         self.state.set_tasks(list(self._tasks.values()))
         self.state.save()
 
-        # 5. Execute with auto-retry
+        # 5. Execute with auto-retry. Each attempt's pending set is
+        # derived from the previous attempt's failures plus the cascade,
+        # not from rescanning every task's status.
         for attempt in range(self.max_retries + 1):
-            pending = [
-                tid for tid, t in self._tasks.items()
-                if t.status in (TaskStatus.PENDING, TaskStatus.FAIL)
-            ]
-            if not pending:
-                logger.info("No pending tasks, all done")
-                break
-
             if attempt > 0:
                 logger.info(
                     "Auto retry attempt %d/%d (%d tasks)",
                     attempt, self.max_retries, len(pending),
                 )
-                self._cascade_invalidation()
-                pending = [
-                    tid for tid, t in self._tasks.items()
-                    if t.status in (TaskStatus.PENDING, TaskStatus.FAIL)
-                ]
-                if not pending:
-                    break
-
-            self._run_pending(pending)
-
-            failed = [tid for tid, t in self._tasks.items()
-                      if t.status == TaskStatus.FAIL]
+
+            failed = self._run_pending(pending)
             if not failed:
                 break
             logger.info("Attempt %d: %d tasks failed", attempt + 1, len(failed))
+            if attempt == self.max_retries:
+                break
+
+            invalidated = self._cascade_invalidation()
+            self.state.update_many(
+                [self._tasks[tid] for tid in invalidated]
+            )
+            pending = list(failed | invalidated)
 
         # 6. Summary
         summary = self._summary()
@@ -112,24 +128,34 @@ class BaseEngine(ABC):
 
         all_passed = summary.get("FAIL", 0) == 0 and summary.get("PENDING", 0) == 0
 
-        # 7. Save final state
-        self.state.save()
+        # 7. Fold the status log back into the snapshot
+        self.state.set_tasks(list(self._tasks.values()))
+        self.state.compact()
 
         return all_passed
 
     def _compute_hashes(self) -> None:
         """Compute input hash for each task."""
+        flow = self.pipeline.flow
         for task in self._tasks.values():
             lib = task.scope.get("lib", "")
             branch = task.scope.get("branch", "")
-            inputs = self.get_inputs(lib, branch, task.step_name)
-            # Include scope in hash so different scopes produce different hashes
-            hash_input = {**inputs, "__scope__": task.scope}
+            inputs = self._resolve_inputs(lib, branch, task.step_name)
+            step = flow.get_step(task.step_name)
+            # Include scope and the step's command template so a changed
+            # scope or a swapped/edited step invalidates a stored PASS
+            hash_input = {
+                **inputs,
+                "__scope__": task.scope,
+                "__step__": f"{step.__class__.__module__}."
+                            f"{step.__class__.__qualname__}",
+                "__base_command__": step.base_command,
+            }
             task.input_hash = InputHasher.compute(hash_input)
 
     def _reconcile_state(self) -> None:
         """Reconcile with saved state for incremental runs."""
-        existing = self.state.load()
+        existing = self.state.load(compact_log=True)
         if not existing:
             return
 
@@ -150,76 +176,96 @@ class BaseEngine(ABC):
             elif old.status == TaskStatus.FAIL:
                 task.status = TaskStatus.PENDING
 
-    def _cascade_invalidation(self) -> None:
-        """If upstream will re-run, mark downstream tasks PENDING."""
+    def _cascade_invalidation(self) -> Set[str]:
+        """If upstream will re-run, mark downstream tasks PENDING.
+
+        Returns the IDs of the newly invalidated tasks.
+        """
         dag = self.pipeline.dag
         invalidated = {
             tid for tid, t in self._tasks.items()
             if t.status in (TaskStatus.PENDING, TaskStatus.FAIL)
         }
         if not invalidated:
-            return
+            return set()
+
+        # One status pass up front: the per-edge check becomes a set
+        # membership test instead of a Task lookup plus enum comparison.
+        passed = {
+            tid for tid, t in self._tasks.items()
+            if t.status is TaskStatus.PASS
+        }
 
         newly_invalidated: Set[str] = set()
-        queue = list(invalidated)
+        queue = deque(invalidated)
         visited: Set[str] = set()
 
         while queue:
-            tid = queue.pop(0)
+            tid = queue.popleft()
             if tid in visited:
                 continue
             visited.add(tid)
 
             for dependent in dag.get_dependents(tid):
-                if dependent not in invalidated and dependent not in newly_invalidated:
-                    dep_task = self._tasks.get(dependent)
-                    if dep_task and dep_task.status == TaskStatus.PASS:
-                        newly_invalidated.add(dependent)
-                        logger.info("Cascade invalidation: %s → %s", tid, dependent)
+                if dependent in passed and dependent not in newly_invalidated:
+                    newly_invalidated.add(dependent)
+                    logger.info("Cascade invalidation: %s → %s", tid, dependent)
                 queue.append(dependent)
 
         for tid in newly_invalidated:
             self._tasks[tid].status = TaskStatus.PENDING
+        return newly_invalidated
+
+    def _run_pending(self, pending_ids: List[str]) -> Set[str]:
+        """Execute pending tasks in topological order.
 
-    def _run_pending(self, pending_ids: List[str]) -> None:
-        """Execute pending tasks in topological order."""
-        order = self.pipeline.dag.topological_sort()
+        Returns the IDs of the tasks that failed, so run() never has to
+        rescan every task's status between attempts.
+        """
+        dag = self.pipeline.dag
         to_run = set(pending_ids)
+        # Sort only the pending subgraph — PASS/SKIP tasks and their
+        # satisfied edges never enter the Kahn walk. Ready tasks are
+        # ordered by critical-path length so long chains start first.
+        run_order = dag.topological_sort(
+            subset=to_run, priorities=self._critical_path_priorities()
+        )
 
-        for tid in order:
-            if tid not in to_run:
-                continue
+        # Track failures as a set so the per-task dependency check is a
+        # set intersection instead of a status scan over Task objects.
+        # Every FAIL task is in the pending set by construction.
+        failed: Set[str] = {
+            tid for tid in pending_ids
+            if self._tasks[tid].status == TaskStatus.FAIL
+        }
 
+        for tid in run_order:
             task = self._tasks[tid]
             step = self.pipeline.flow.get_step(task.step_name)
 
             lib = task.scope.get("lib", "")
             branch = task.scope.get("branch", "")
-            inputs = self.get_inputs(lib, branch, task.step_name)
+            # Copy before mutating: the resolved dict is shared via cache
+            inputs = dict(self._resolve_inputs(lib, branch, task.step_name))
             inputs["output_dir"] = task.output_dir
 
             # Check if upstream deps all passed
-            deps = self.pipeline.dag.get_dependencies(tid)
-            dep_failed = any(
-                self._tasks.get(d, Task(step_name="")).status == TaskStatus.FAIL
-                for d in deps
-            )
-            if dep_failed:
+            deps = dag.get_dependencies(tid)
+            if not failed.isdisjoint(deps):
                 task.status = TaskStatus.FAIL
                 task.error_message = "Upstream dependency failed"
-                self.state.set_tasks(list(self._tasks.values()))
-                self.state.save()
+                failed.add(tid)
+                self.state.update(task)
                 continue
 
             # Ensure output dir exists
             if task.output_dir:
-                os.makedirs(task.output_dir, exist_ok=True)
+                self._ensure_dir(task.output_dir)
             if task.log_path:
-                os.makedirs(os.path.dirname(task.log_path), exist_ok=True)
+                self._ensure_dir(os.path.dirname(task.log_path))
 
             task.status = TaskStatus.RUNNING
-            self.state.set_tasks(list(self._tasks.values()))
-            self.state.save()
+            self.state.update(task)
 
             # Execute
             success = self._execute_task(task, step, inputs)
@@ -227,8 +273,8 @@ class BaseEngine(ABC):
             if not success:
                 task.status = TaskStatus.FAIL
                 task.error_message = "Execution failed (non-zero exit code)"
-                self.state.set_tasks(list(self._tasks.values()))
-                self.state.save()
+                failed.add(tid)
+                self.state.update(task)
                 continue
 
             # Validate: scan log for errors
@@ -244,8 +290,55 @@ class BaseEngine(ABC):
                 task.error_message = validation.summary()
                 logger.warning("Task %s: FAIL - %s", tid, task.error_message)
 
-            self.state.set_tasks(list(self._tasks.values()))
-            self.state.save()
+            if task.status == TaskStatus.FAIL:
+                failed.add(tid)
+            else:
+                # A retried task that passes leaves the failed set, so
+                # its dependents later in the order can run.
+                failed.discard(tid)
+            self.state.update(task)
+
+        return failed
+
+    def _resolve_inputs(self, lib: str, branch: str, step_name: str) -> Dict[str, Any]:
+        """get_inputs with caching per (lib, branch, step).
+
+        The same key is resolved during hashing, dispatch and every retry
+        attempt; user get_inputs callbacks may template paths or hit the
+        filesystem, so resolve each key once. Callers must not mutate the
+        returned dict.
+        """
+        key = (lib, branch, step_name)
+        inputs = self._inputs_cache.get(key)
+        if inputs is None:
+            inputs = self.get_inputs(lib, branch, step_name)
+            self._inputs_cache[key] = inputs
+        return inputs
+
+    def _critical_path_priorities(self) -> Dict[str, float]:
+        """Critical-path lengths from per-step duration estimates.
+
+        Computed once per engine since both the DAG and the estimates
+        are fixed for the lifetime of a pipeline.
+        """
+        if self._cpl is None:
+            flow = self.pipeline.flow
+            durations = {
+                tid: flow.get_step(t.step_name).estimate_duration()
+                for tid, t in self._tasks.items()
+            }
+            self._cpl = self.pipeline.dag.critical_path_lengths(durations)
+        return self._cpl
+
+    def _ensure_dir(self, path: str) -> None:
+        """os.makedirs, skipping directories already created this run.
+
+        Tasks share a small number of output directories, so caching the
+        created set avoids a stat syscall per task.
+        """
+        if path and path not in self._dirs_created:
+            os.makedirs(path, exist_ok=True)
+            self._dirs_created.add(path)
 
     def _validate_task(self, task: Task, step: Step) -> ValidationResult:
         """Validate a completed task: check log for errors."""
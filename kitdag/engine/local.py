@@ -1,7 +1,6 @@
 """LocalEngine — runs tasks locally using subprocess."""
 
 import logging
-import os
 import subprocess
 from typing import Any, Dict
 
@@ -27,7 +26,7 @@ class LocalEngine(BaseEngine):
         try:
             log_file = None
             if task.log_path:
-                os.makedirs(os.path.dirname(task.log_path), exist_ok=True)
+                # Log directory was created by BaseEngine._run_pending
                 log_file = open(task.log_path, "w")
 
             result = subprocess.run(
@@ -1,5 +1,8 @@
-from kitdag.executor.base import Executor, Job
-from kitdag.executor.local import LocalExecutor
-from kitdag.executor.lsf import LSFExecutor
-
-__all__ = ["Executor", "Job", "LocalExecutor", "LSFExecutor"]
+from kitdag.executor.aio import AsyncLocalExecutor
+from kitdag.executor.base import Executor, Job
+from kitdag.executor.local import LocalExecutor
+from kitdag.executor.lsf import LSFExecutor
+
+__all__ = [
+    "AsyncLocalExecutor", "Executor", "Job", "LocalExecutor", "LSFExecutor",
+]
@@ -0,0 +1,241 @@
+"""AsyncLocalExecutor - asyncio-based local job execution."""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from kitdag.executor.base import Executor, Job
+from kitdag.executor.local import _close_log_fd
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLocalExecutor(Executor):
+    """Execute jobs locally on a single asyncio event-loop thread.
+
+    One thread manages every concurrent subprocess through non-blocking
+    ``await proc.wait()``, so memory and context-switch cost stay O(1)
+    in the number of in-flight jobs instead of one worker thread (and
+    stack) per slot. ``max_workers`` still bounds how many subprocesses
+    run at once, via a semaphore.
+
+    Dependency semantics match LocalExecutor: jobs start when their
+    unmet-dependency count reaches zero, and a failed dependency fails
+    its whole descendant subtree immediately. All bookkeeping is mutated
+    only on the loop thread, so no locks are needed.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._max_workers = max_workers
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._jobs: Dict[str, Job] = {}
+        self._results: Dict[str, bool] = {}
+        self._done: Set[str] = set()
+        self._failed: Set[str] = set()
+        self._deps_remaining: Dict[str, int] = {}
+        self._children: Dict[str, List[str]] = {}
+        self._tasks: Dict[str, "asyncio.Task"] = {}
+        self._dirs_seen: Set[str] = set()
+        self._progress: Optional[asyncio.Event] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the event-loop thread on first submission."""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="kitdag-aio", daemon=True,
+            )
+            self._thread.start()
+        return self._loop
+
+    def submit(self, job: Job) -> None:
+        self._ensure_loop().call_soon_threadsafe(self._register, job)
+
+    def submit_batch(self, jobs: List[Job]) -> None:
+        """Submit many jobs with a single hop to the loop thread."""
+        def register_all() -> None:
+            for job in jobs:
+                self._register(job)
+        self._ensure_loop().call_soon_threadsafe(register_all)
+
+    def wait_all(self) -> Dict[str, bool]:
+        if self._loop is None:
+            return dict(self._results)
+        future = asyncio.run_coroutine_threadsafe(
+            self._wait_all_async(), self._loop
+        )
+        return future.result()
+
+    def cancel_all(self) -> None:
+        if self._loop is None:
+            return
+
+        def cancel() -> None:
+            for task in self._tasks.values():
+                task.cancel()
+        self._loop.call_soon_threadsafe(cancel)
+
+    def shutdown(self) -> None:
+        """Stop the event-loop thread. The executor is unusable after."""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    # ------------------------------------------------------------------
+    # Everything below runs on the loop thread only
+    # ------------------------------------------------------------------
+
+    def _register(self, job: Job) -> None:
+        self._jobs[job.id] = job
+
+        if not self._failed.isdisjoint(job.dependencies):
+            logger.warning(
+                "Job %s skipped: dependency failed (%s)",
+                job.id, self._failed & job.dependencies,
+            )
+            self._finish(job.id, False)
+            return
+
+        unmet = {d for d in job.dependencies if d not in self._done}
+        self._deps_remaining[job.id] = len(unmet)
+        for dep_id in unmet:
+            self._children.setdefault(dep_id, []).append(job.id)
+        if not unmet:
+            self._start(job)
+
+    def _start(self, job: Job) -> None:
+        task = self._loop.create_task(self._run_job(job))
+        # Safety net: a task cancelled before its coroutine first runs
+        # never reaches the coroutine's own CancelledError handling, so
+        # record the failure here or waiters would never complete.
+        task.add_done_callback(
+            lambda t, jid=job.id: self._on_task_done(jid, t)
+        )
+        self._tasks[job.id] = task
+
+    def _on_task_done(self, job_id: str, task: "asyncio.Task") -> None:
+        if job_id in self._done:
+            return
+        if task.cancelled():
+            logger.warning("Job %s cancelled before starting", job_id)
+        elif task.exception() is None:
+            return
+        self._finish(job_id, False)
+
+    async def _run_job(self, job: Job) -> None:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self._max_workers)
+
+        # Cancellation while waiting for a worker slot propagates out of
+        # the acquire; the task's done callback records the failure.
+        cancelled = False
+        async with self._sem:
+            log_fd = None
+            proc = None
+            if job.log_path:
+                log_dir = os.path.dirname(job.log_path)
+                if log_dir and log_dir not in self._dirs_seen:
+                    os.makedirs(log_dir, exist_ok=True)
+                    self._dirs_seen.add(log_dir)
+                log_fd = os.open(
+                    job.log_path,
+                    os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND,
+                    0o644,
+                )
+
+            try:
+                if log_fd is not None:
+                    header = (
+                        f"# Job: {job.id}\n"
+                        f"# Command: {' '.join(job.command)}\n"
+                        f"# CWD: {job.cwd}\n"
+                        f"# Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                        + "# " + "=" * 60 + "\n"
+                    ).encode()
+                    os.write(log_fd, header)
+
+                env = dict(os.environ)
+                env.update(job.environment)
+
+                proc = await asyncio.create_subprocess_exec(
+                    *job.command,
+                    cwd=job.cwd,
+                    stdout=log_fd,
+                    stderr=asyncio.subprocess.STDOUT,
+                    env=env,
+                )
+                returncode = await proc.wait()
+
+                success = returncode == 0
+                if log_fd is not None:
+                    os.write(
+                        log_fd, f"\n# Exit code: {returncode}\n".encode()
+                    )
+            except asyncio.CancelledError:
+                # Torn down at an await point: kill the child (it would
+                # otherwise keep running unobserved) and record the job
+                # as failed so waiters still complete.
+                success = False
+                cancelled = True
+                if proc is not None and proc.returncode is None:
+                    proc.kill()
+                if log_fd is not None:
+                    os.write(log_fd, b"\n# CANCELLED\n")
+                logger.warning("Job %s cancelled", job.id)
+            except Exception as e:
+                success = False
+                if log_fd is not None:
+                    os.write(log_fd, f"\n# EXCEPTION: {e}\n".encode())
+                logger.exception("Job %s failed with exception", job.id)
+            finally:
+                if log_fd is not None:
+                    _close_log_fd(log_fd)
+
+        self._finish(job.id, success)
+        if cancelled:
+            raise asyncio.CancelledError
+
+    def _finish(self, job_id: str, success: bool) -> None:
+        queue = [(job_id, success)]
+        while queue:
+            jid, ok = queue.pop()
+            if jid in self._done:
+                continue
+            self._done.add(jid)
+            if not ok:
+                self._failed.add(jid)
+            self._results[jid] = ok
+
+            for child_id in self._children.pop(jid, ()):
+                if child_id in self._done:
+                    continue
+                if ok:
+                    self._deps_remaining[child_id] -= 1
+                    if self._deps_remaining[child_id] == 0:
+                        self._start(self._jobs[child_id])
+                else:
+                    logger.warning(
+                        "Job %s skipped: dependency failed (%s)",
+                        child_id, jid,
+                    )
+                    queue.append((child_id, False))
+
+            self._notify(jid, ok)
+
+        if self._progress is not None:
+            self._progress.set()
+
+    async def _wait_all_async(self) -> Dict[str, bool]:
+        if self._progress is None:
+            self._progress = asyncio.Event()
+        while len(self._results) < len(self._jobs):
+            self._progress.clear()
+            await self._progress.wait()
+        return dict(self._results)
@@ -2,19 +2,31 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Set
+from typing import Callable, Dict, Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Job:
-    """A single executable unit in the kitdag pipeline."""
+    """A single executable unit in the kitdag pipeline.
+
+    Frozen: a Job never changes after construction, so executors can
+    share instances across threads without copying. ``command`` and
+    ``dependencies`` accept any iterable and are normalized to a tuple /
+    frozenset (subprocess and shlex take tuples as-is).
+    """
 
     id: str
-    command: List[str]
+    command: Tuple[str, ...]
     cwd: str = "."
     log_path: str = ""
     environment: Dict[str, str] = field(default_factory=dict)
-    dependencies: Set[str] = field(default_factory=set)
+    dependencies: "frozenset[str]" = field(default_factory=frozenset)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "command", tuple(self.command))
+        object.__setattr__(
+            self, "dependencies", frozenset(self.dependencies)
+        )
 
 
 class Executor(ABC):
@@ -1,120 +1,526 @@
-"""LocalExecutor - ThreadPool-based local job execution."""
-
-import logging
-import os
-import subprocess
-import time
-from concurrent.futures import Future, ThreadPoolExecutor
-from typing import Dict, Optional, Set
-
-from kitdag.executor.base import Executor, Job
-
-logger = logging.getLogger(__name__)
-
-
-class LocalExecutor(Executor):
-    """Execute jobs locally using a thread pool.
-
-    Dependencies are tracked: a job waits until all its dependencies
-    have completed successfully before starting.
-    """
-
-    def __init__(self, max_workers: int = 4):
-        self._max_workers = max_workers
-        self._pool: Optional[ThreadPoolExecutor] = None
-        self._jobs: Dict[str, Job] = {}
-        self._futures: Dict[str, Future] = {}
-        self._results: Dict[str, bool] = {}
-        self._done: Set[str] = set()
-        self._failed: Set[str] = set()
-
-    def submit(self, job: Job) -> None:
-        if self._pool is None:
-            self._pool = ThreadPoolExecutor(max_workers=self._max_workers)
-
-        self._jobs[job.id] = job
-        future = self._pool.submit(self._run_job, job)
-        self._futures[job.id] = future
-
-    def _run_job(self, job: Job) -> bool:
-        # Wait for dependencies
-        while True:
-            unmet = job.dependencies - self._done
-            if not unmet:
-                break
-            # Check if any dependency failed
-            if unmet & self._failed:
-                logger.warning(
-                    "Job %s skipped: dependency failed (%s)",
-                    job.id, unmet & self._failed,
-                )
-                self._failed.add(job.id)
-                self._done.add(job.id)
-                self._results[job.id] = False
-                self._notify(job.id, False)
-                return False
-            time.sleep(0.1)
-
-        # Execute
-        os.makedirs(os.path.dirname(job.log_path) if job.log_path else ".", exist_ok=True)
-        log_file = open(job.log_path, "w") if job.log_path else None
-
-        try:
-            if log_file:
-                log_file.write(f"# Job: {job.id}\n")
-                log_file.write(f"# Command: {' '.join(job.command)}\n")
-                log_file.write(f"# CWD: {job.cwd}\n")
-                log_file.write(f"# Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                log_file.write("# " + "=" * 60 + "\n")
-                log_file.flush()
-
-            env = dict(os.environ)
-            env.update(job.environment)
-
-            result = subprocess.run(
-                job.command,
-                cwd=job.cwd,
-                stdout=log_file,
-                stderr=subprocess.STDOUT,
-                env=env,
-            )
-
-            success = result.returncode == 0
-            if log_file:
-                log_file.write(f"\n# Exit code: {result.returncode}\n")
-
-        except Exception as e:
-            success = False
-            if log_file:
-                log_file.write(f"\n# EXCEPTION: {e}\n")
-            logger.exception("Job %s failed with exception", job.id)
-        finally:
-            if log_file:
-                log_file.close()
-
-        if success:
-            self._done.add(job.id)
-        else:
-            self._failed.add(job.id)
-            self._done.add(job.id)
-
-        self._results[job.id] = success
-        self._notify(job.id, success)
-        return success
-
-    def wait_all(self) -> Dict[str, bool]:
-        for future in self._futures.values():
-            future.result()
-
-        if self._pool:
-            self._pool.shutdown(wait=True)
-            self._pool = None
-
-        return dict(self._results)
-
-    def cancel_all(self) -> None:
-        for future in self._futures.values():
-            future.cancel()
-        if self._pool:
-            self._pool.shutdown(wait=False)
-            self._pool = None
+"""LocalExecutor - ThreadPool-based local job execution."""
+
+import logging
+import os
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from kitdag.executor.base import Executor, Job
+
+logger = logging.getLogger(__name__)
+
+
+def _pidfd_supported() -> bool:
+    """pidfd_open needs Python 3.9+ and Linux 5.3+; probe on ourselves."""
+    if not hasattr(os, "pidfd_open"):
+        return False
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+        return True
+    except OSError:
+        return False
+
+
+_HAVE_PIDFD = _pidfd_supported()
+
+
+def _close_log_fd(fd: int) -> None:
+    """Drop the log's cached pages, then close the fd.
+
+    Job logs are written once and rarely re-read; advising DONTNEED at
+    close keeps a big run's log output from evicting hotter data from
+    the page cache.
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+    os.close(fd)
+
+
+class LocalExecutor(Executor):
+    """Execute jobs locally using a thread pool.
+
+    Dependencies are tracked event-driven: each job keeps a count of
+    unmet dependencies and is handed to the pool only when the count
+    reaches zero, so worker threads never sit in a poll loop waiting for
+    upstream jobs. When a dependency fails, its dependents are marked
+    failed immediately without occupying a worker.
+
+    With persistent_shells=True each worker thread keeps one long-lived
+    ``bash`` process and dispatches commands to it over stdin, reading
+    back a sentinel line with the exit code. This amortizes the
+    fork/exec cost of a fresh interpreter per job, which dominates for
+    many small commands. Commands run in a subshell, so cwd and
+    environment never leak between jobs. The default (off) runs each
+    command directly without a shell in between.
+    """
+
+    def __init__(self, max_workers: int = 4, persistent_shells: bool = False):
+        self._max_workers = max_workers
+        self._persistent_shells = persistent_shells
+        self._shells: List[subprocess.Popen] = []
+        self._tls = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, Job] = {}
+        self._futures: Dict[str, Future] = {}
+        self._results: Dict[str, bool] = {}
+        self._done: Set[str] = set()
+        self._failed: Set[str] = set()
+        self._deps_remaining: Dict[str, int] = {}
+        self._children: Dict[str, List[str]] = {}
+        self._dirs_seen: Set[str] = set()
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._pid_to_job: Dict[int, "tuple"] = {}
+        self._reaper_thread: Optional[threading.Thread] = None
+        self._reaper_stop = False
+        self._selector: Optional[selectors.BaseSelector] = None
+
+    def submit(self, job: Job) -> None:
+        self.submit_batch([job])
+
+    def submit_batch(self, jobs: List[Job]) -> None:
+        """Submit many jobs with a single lock acquisition.
+
+        Burst submission (e.g. the engine walking a topo level) pays one
+        lock round-trip for the whole batch instead of one per job.
+        """
+        if not jobs:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers)
+
+        ready: List[Job] = []
+        dep_failed: List[Job] = []
+        with self._lock:
+            for job in jobs:
+                self._jobs[job.id] = job
+
+                if any(d in self._failed for d in job.dependencies):
+                    dep_failed.append(job)
+                    continue
+                unmet = {d for d in job.dependencies if d not in self._done}
+                self._deps_remaining[job.id] = len(unmet)
+                for dep_id in unmet:
+                    self._children.setdefault(dep_id, []).append(job.id)
+                if not unmet:
+                    ready.append(job)
+
+        for job in dep_failed:
+            logger.warning(
+                "Job %s skipped: dependency failed (%s)",
+                job.id, self._failed & set(job.dependencies),
+            )
+            self._finish(job.id, False)
+
+        for job in ready:
+            self._submit_to_pool(job)
+
+    def _submit_to_pool(self, job: Job) -> None:
+        future = self._pool.submit(self._run_job, job)
+        future.add_done_callback(
+            lambda fut, jid=job.id: self._on_future_done(jid, fut)
+        )
+        self._futures[job.id] = future
+
+    def _on_future_done(self, job_id: str, future: Future) -> None:
+        """Safety net mirroring aio's task done-callback.
+
+        An exception escaping _run_job (e.g. the log open failing on a
+        bad log_path) or a Future cancelled before it ran would
+        otherwise vanish into the Future and leave the job unrecorded —
+        and wait()/wait_all() blocked forever.
+        """
+        if future.cancelled():
+            self._finish(job_id, False)
+            return
+        exc = future.exception()
+        if exc is not None:
+            logger.error("Job %s failed with exception: %s", job_id, exc)
+            self._finish(job_id, False)
+
+    def _run_job(self, job: Job) -> bool:
+        if self._persistent_shells:
+            return self._run_job_shell(job)
+        return self._run_job_spawn(job)
+
+    def _run_job_spawn(self, job: Job) -> bool:
+        # Write the log through a raw fd: one unbuffered write for the
+        # header, then the fd is handed straight to the child process —
+        # no Python-level buffer sits between the job and its log file.
+        log_fd = None
+        if job.log_path:
+            # Jobs share a handful of log directories — only hit the
+            # filesystem for ones we haven't created yet.
+            log_dir = os.path.dirname(job.log_path)
+            if log_dir and log_dir not in self._dirs_seen:
+                os.makedirs(log_dir, exist_ok=True)
+                self._dirs_seen.add(log_dir)
+            # O_APPEND makes every write atomically seek-to-end in the
+            # kernel, so a job that forks its own writers to the same
+            # log needs no userspace locking. Cached pages are dropped
+            # at close (_close_log_fd).
+            log_fd = os.open(
+                job.log_path,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND,
+                0o644,
+            )
+
+        try:
+            if log_fd is not None:
+                header = (
+                    f"# Job: {job.id}\n"
+                    f"# Command: {' '.join(job.command)}\n"
+                    f"# CWD: {job.cwd}\n"
+                    f"# Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    + "# " + "=" * 60 + "\n"
+                ).encode()
+                os.write(log_fd, header)
+
+            env = dict(os.environ)
+            env.update(job.environment)
+
+            if job.cwd in ("", "."):
+                # posix_spawn avoids fork()'s page-table copy, which
+                # matters on large-RSS hosts; the pre-opened log fd is
+                # dup2'ed onto the child's stdout/stderr. It cannot
+                # chdir, so jobs with a custom cwd take the Popen path.
+                file_actions = []
+                if log_fd is not None:
+                    file_actions = [
+                        (os.POSIX_SPAWN_DUP2, log_fd, 1),
+                        (os.POSIX_SPAWN_DUP2, log_fd, 2),
+                    ]
+                pid = os.posix_spawnp(
+                    job.command[0], job.command, env,
+                    file_actions=file_actions,
+                )
+                # Hand the child to the reaper thread and free this
+                # worker immediately; the reaper writes the exit-code
+                # trailer, closes the log fd and finishes the job.
+                with self._lock:
+                    self._pid_to_job[pid] = (job, log_fd)
+                    if self._reaper_thread is None:
+                        self._reaper_stop = False
+                        if _HAVE_PIDFD:
+                            self._selector = selectors.DefaultSelector()
+                        self._reaper_thread = threading.Thread(
+                            target=self._reap_loop,
+                            name="kitdag-reaper", daemon=True,
+                        )
+                        self._reaper_thread.start()
+                    if self._selector is not None:
+                        self._selector.register(
+                            os.pidfd_open(pid), selectors.EVENT_READ,
+                            data=pid,
+                        )
+                log_fd = None  # fd ownership passed to the reaper
+                return True
+            else:
+                result = subprocess.run(
+                    job.command,
+                    cwd=job.cwd,
+                    stdout=log_fd,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                )
+                returncode = result.returncode
+
+            success = returncode == 0
+            if log_fd is not None:
+                os.write(log_fd, f"\n# Exit code: {returncode}\n".encode())
+
+        except Exception as e:
+            success = False
+            if log_fd is not None:
+                os.write(log_fd, f"\n# EXCEPTION: {e}\n".encode())
+            logger.exception("Job %s failed with exception", job.id)
+        finally:
+            if log_fd is not None:
+                _close_log_fd(log_fd)
+
+        self._finish(job.id, success)
+        return success
+
+    def _run_job_shell(self, job: Job) -> bool:
+        """Dispatch a job to this worker thread's persistent bash.
+
+        The command is framed as one shell line ending in an
+        ``__DONE__ $?`` sentinel echo, so one pipe write replaces a
+        fork/exec and the exit code comes back on the shell's stdout.
+        """
+        if job.log_path:
+            log_dir = os.path.dirname(job.log_path)
+            if log_dir and log_dir not in self._dirs_seen:
+                os.makedirs(log_dir, exist_ok=True)
+                self._dirs_seen.add(log_dir)
+            header_fd = os.open(
+                job.log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644,
+            )
+            header = (
+                f"# Job: {job.id}\n"
+                f"# Command: {' '.join(job.command)}\n"
+                f"# CWD: {job.cwd}\n"
+                f"# Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                + "# " + "=" * 60 + "\n"
+            ).encode()
+            os.write(header_fd, header)
+            os.close(header_fd)
+            redirect = f">>{shlex.quote(job.log_path)} 2>&1"
+        else:
+            redirect = ">/dev/null 2>&1"
+
+        # Subshell keeps cd/env local to the job; </dev/null stops a job
+        # from swallowing the control pipe.
+        parts = [f"cd {shlex.quote(job.cwd)}"]
+        if job.environment:
+            exports = " ".join(
+                f"{k}={shlex.quote(v)}" for k, v in job.environment.items()
+            )
+            parts.append(f"export {exports}")
+        parts.append(shlex.join(job.command))
+        line = (
+            f"( {' && '.join(parts)} ) {redirect} </dev/null; "
+            f"echo __DONE__ $?\n"
+        )
+
+        try:
+            shell = self._worker_shell()
+            shell.stdin.write(line)
+            shell.stdin.flush()
+            reply = shell.stdout.readline()
+            if not reply.startswith("__DONE__ "):
+                raise RuntimeError(f"shell worker died (read {reply!r})")
+            returncode = int(reply.split()[1])
+            success = returncode == 0
+            if job.log_path:
+                with open(job.log_path, "a") as f:
+                    f.write(f"\n# Exit code: {returncode}\n")
+        except Exception as e:
+            success = False
+            self._tls.shell = None
+            if job.log_path:
+                with open(job.log_path, "a") as f:
+                    f.write(f"\n# EXCEPTION: {e}\n")
+            logger.exception("Job %s failed with exception", job.id)
+
+        self._finish(job.id, success)
+        return success
+
+    def _reap_loop(self) -> None:
+        """Reaper thread: collect exited children and finish their jobs.
+
+        One thread reaps every posix_spawn'ed child, so worker threads
+        never sit blocked in waitpid for the lifetime of a job. Each pid
+        is waited on individually (P_PID) — a wait on -1 would steal
+        children spawned elsewhere in the process, e.g. by the
+        subprocess module.
+
+        Where pidfd_open is available, each child is wrapped in a pidfd
+        registered with a selector: one epoll_wait watches every
+        outstanding child and only exited ones are waited on. Older
+        kernels fall back to a WNOHANG scan.
+        """
+        if self._selector is not None:
+            self._reap_loop_pidfd()
+        else:
+            self._reap_loop_scan()
+
+    def _reap_loop_pidfd(self) -> None:
+        sel = self._selector
+        while True:
+            with self._lock:
+                if not self._pid_to_job and self._reaper_stop:
+                    self._reaper_thread = None
+                    self._selector = None
+                    sel.close()
+                    return
+
+            # Short timeout so pids registered mid-wait and the stop
+            # flag are picked up promptly.
+            for key, _ in sel.select(timeout=0.05):
+                pid = key.data
+                sel.unregister(key.fileobj)
+                os.close(key.fileobj)
+                res = os.waitid(os.P_PID, pid, os.WEXITED)
+                with self._lock:
+                    job, log_fd = self._pid_to_job.pop(pid)
+                success = (
+                    res is not None
+                    and res.si_code == os.CLD_EXITED
+                    and res.si_status == 0
+                )
+                self._reap_one(
+                    job, log_fd, success,
+                    exit_status=res.si_status if res is not None else None,
+                )
+
+    def _reap_loop_scan(self) -> None:
+        while True:
+            with self._lock:
+                pids = list(self._pid_to_job)
+                if not pids and self._reaper_stop:
+                    self._reaper_thread = None
+                    return
+
+            reaped = False
+            for pid in pids:
+                try:
+                    res = os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG)
+                except ChildProcessError:
+                    res = None
+                    with self._lock:
+                        job, log_fd = self._pid_to_job.pop(pid)
+                    self._reap_one(job, log_fd, success=False)
+                    reaped = True
+                if res is not None and res.si_pid == pid:
+                    with self._lock:
+                        job, log_fd = self._pid_to_job.pop(pid)
+                    success = (
+                        res.si_code == os.CLD_EXITED and res.si_status == 0
+                    )
+                    self._reap_one(job, log_fd, success,
+                                   exit_status=res.si_status)
+                    reaped = True
+
+            if not reaped:
+                time.sleep(0.005)
+
+    def _reap_one(self, job: Job, log_fd: Optional[int], success: bool,
+                  exit_status: Optional[int] = None) -> None:
+        if log_fd is not None:
+            if exit_status is not None:
+                os.write(log_fd, f"\n# Exit code: {exit_status}\n".encode())
+            _close_log_fd(log_fd)
+        self._finish(job.id, success)
+
+    def _stop_reaper(self) -> None:
+        with self._lock:
+            self._reaper_stop = True
+            thread = self._reaper_thread
+        if thread is not None:
+            thread.join()
+
+    def _worker_shell(self) -> subprocess.Popen:
+        """Return this worker thread's bash, starting one if needed."""
+        shell = getattr(self._tls, "shell", None)
+        if shell is None or shell.poll() is not None:
+            shell = subprocess.Popen(
+                ["bash"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            self._tls.shell = shell
+            with self._lock:
+                self._shells.append(shell)
+        return shell
+
+    def _stop_shells(self) -> None:
+        with self._lock:
+            shells, self._shells = self._shells, []
+        for shell in shells:
+            if shell.poll() is None:
+                shell.stdin.close()
+                shell.wait()
+            shell.stdout.close()
+
+    def _finish(self, job_id: str, success: bool) -> None:
+        """Record a job outcome and schedule (or fail) its dependents.
+
+        Failure propagates through the whole descendant subtree with an
+        iterative worklist — a deep chain of failed dependents never
+        recurses or touches a subprocess.
+        """
+        queue = deque([(job_id, success)])
+
+        while queue:
+            jid, ok = queue.popleft()
+            to_run: List[str] = []
+
+            with self._lock:
+                if jid in self._done:
+                    continue
+                self._done.add(jid)
+                if not ok:
+                    self._failed.add(jid)
+                self._results[jid] = ok
+
+                for child_id in self._children.pop(jid, ()):
+                    if child_id in self._done:
+                        continue
+                    if ok:
+                        self._deps_remaining[child_id] -= 1
+                        if self._deps_remaining[child_id] == 0:
+                            to_run.append(child_id)
+                    else:
+                        logger.warning(
+                            "Job %s skipped: dependency failed (%s)",
+                            child_id, jid,
+                        )
+                        queue.append((child_id, False))
+
+                self._cv.notify_all()
+
+            self._notify(jid, ok)
+
+            for child_id in to_run:
+                self._submit_to_pool(self._jobs[child_id])
+
+    def wait(self, job_ids: "Set[str]") -> Dict[str, bool]:
+        """Block until the given job IDs have completed.
+
+        A single condition wait: the waiter wakes on completion
+        notifications and returns once every requested ID is done,
+        instead of polling or joining jobs one at a time. Workers and
+        shells stay up, so more jobs can be submitted afterwards.
+        """
+        wanted = set(job_ids)
+        with self._cv:
+            self._cv.wait_for(lambda: wanted <= self._done)
+            return {jid: self._results[jid] for jid in wanted}
+
+    def wait_all(self) -> Dict[str, bool]:
+        with self._cv:
+            self._cv.wait_for(
+                lambda: len(self._results) == len(self._jobs)
+            )
+
+        if self._pool:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._stop_reaper()
+        self._stop_shells()
+
+        return dict(self._results)
+
+    def cancel_all(self) -> None:
+        for future in self._futures.values():
+            future.cancel()
+        if self._pool:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        # Only flag the reaper — joining it would block until every
+        # outstanding child exits on its own. The daemon thread keeps
+        # draining them in the background, mirroring how already-running
+        # pool jobs are left to finish.
+        with self._lock:
+            self._reaper_stop = True
+            pending = [jid for jid in self._jobs if jid not in self._done]
+        # Record everything unfinished as failed, like the asyncio
+        # backend: cancelled futures never reach _run_job, and
+        # dependency-blocked jobs have no future at all — either would
+        # leave wait_all() blocked forever. A job whose worker or reaper
+        # completes afterwards is skipped by _finish's done guard, so
+        # nothing gets scheduled onto the torn-down pool.
+        for jid in pending:
+            self._finish(jid, False)
+        self._stop_shells()
@@ -3,7 +3,9 @@
 import logging
 import os
 import re
+import shlex
 import subprocess
+import threading
 import time
 from abc import abstractmethod
 from typing import Dict, List, Optional, Set
@@ -18,15 +20,27 @@ class LSFExecutor(Executor):
 
     Subclass and implement get_bsub_flags() for site-specific configuration
     (queue name, resource requirements, etc.).
+
+    With blocking_submit=True, jobs are submitted with ``bsub -K`` from a
+    thread per job: bsub itself blocks until the job finishes, so
+    completions are observed immediately instead of on the next bjobs
+    poll tick. Dependencies are enforced locally in this mode — each
+    submit thread waits for its dependencies to complete (and skips the
+    bsub if one failed) instead of passing ``-w`` conditions, since an
+    upstream's LSF id is only known once its own bsub -K has returned.
     """
 
-    POLL_INTERVAL = 10  # seconds
+    POLL_INTERVAL = 10  # seconds (maximum, reached via backoff)
+    MIN_POLL_INTERVAL = 0.2  # seconds
 
-    def __init__(self):
+    def __init__(self, blocking_submit: bool = False):
+        self._blocking_submit = blocking_submit
         self._jobs: Dict[str, Job] = {}
         self._lsf_ids: Dict[str, str] = {}  # job_id -> LSF job ID
         self._results: Dict[str, bool] = {}
         self._dep_map: Dict[str, Set[str]] = {}  # job_id -> dependency job_ids
+        self._submit_threads: List[threading.Thread] = []
+        self._cv = threading.Condition()  # guards _results in blocking mode
 
     @abstractmethod
     def get_bsub_flags(self, job: Job) -> List[str]:
@@ -54,19 +68,32 @@ class LSFExecutor(Executor):
         # Working directory
         cmd.extend(["-cwd", job.cwd])
 
-        # LSF dependency conditions
-        dep_conditions = []
-        for dep_id in job.dependencies:
-            if dep_id in self._lsf_ids:
-                dep_conditions.append(f"done({self._lsf_ids[dep_id]})")
-            else:
-                # Use job name for deps not yet submitted
-                dep_conditions.append(f"done({dep_id})")
-        if dep_conditions:
-            cmd.extend(["-w", " && ".join(dep_conditions)])
-
-        # The actual command
-        cmd.append(" ".join(job.command))
+        # LSF dependency conditions. In blocking mode dependencies are
+        # enforced locally (see _submit_blocking): the upstream's LSF id
+        # is unknown until its bsub -K returns, and a -w by job name
+        # could reach LSF before the upstream bsub has registered it.
+        if not self._blocking_submit:
+            dep_conditions = []
+            for dep_id in job.dependencies:
+                if dep_id in self._lsf_ids:
+                    dep_conditions.append(f"done({self._lsf_ids[dep_id]})")
+                else:
+                    # Use job name for deps not yet submitted
+                    dep_conditions.append(f"done({dep_id})")
+            if dep_conditions:
+                cmd.extend(["-w", " && ".join(dep_conditions)])
+
+        # The actual command — shell-quoted, since bsub re-parses it
+        cmd.append(shlex.join(job.command))
+
+        if self._blocking_submit:
+            cmd.insert(1, "-K")
+            thread = threading.Thread(
+                target=self._submit_blocking, args=(job, cmd), daemon=True,
+            )
+            self._submit_threads.append(thread)
+            thread.start()
+            return
 
         # Submit
         try:
@@ -86,19 +113,70 @@ class LSFExecutor(Executor):
             self._results[job.id] = False
             self._notify(job.id, False)
 
+    def _submit_blocking(self, job: Job, cmd: List[str]) -> None:
+        """Run 'bsub -K' — returns only once the job has finished.
+
+        Waits for the job's dependencies to complete locally before
+        invoking bsub; a failed dependency skips the submission and
+        marks the job failed, like the local executors do.
+        """
+        deps = self._dep_map[job.id]
+        with self._cv:
+            self._cv.wait_for(lambda: deps <= set(self._results))
+            dep_failed = any(not self._results[d] for d in deps)
+
+        if dep_failed:
+            logger.warning(
+                "Job %s skipped: dependency failed (%s)",
+                job.id, {d for d in deps if not self._results[d]},
+            )
+            success = False
+        else:
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                lsf_id = self._parse_job_id(result.stdout)
+                if lsf_id:
+                    self._lsf_ids[job.id] = lsf_id
+                success = result.returncode == 0
+            except Exception as e:
+                logger.error(
+                    "Blocking submit of job %s failed: %s", job.id, e
+                )
+                success = False
+
+        with self._cv:
+            self._results[job.id] = success
+            self._cv.notify_all()
+        self._notify(job.id, success)
+
     def wait_all(self) -> Dict[str, bool]:
-        """Poll bjobs until all jobs complete."""
+        """Poll bjobs until all jobs complete.
+
+        All pending jobs are queried with a single bjobs invocation per
+        poll tick rather than one subprocess per job. In blocking-submit
+        mode there is nothing to poll — each bsub -K thread reports its
+        job as soon as bsub returns.
+        """
+        if self._blocking_submit:
+            for thread in self._submit_threads:
+                thread.join()
+            return dict(self._results)
+
         pending = set(self._lsf_ids.keys()) - set(self._results.keys())
 
+        # Adaptive backoff: poll quickly while jobs are completing, decay
+        # towards POLL_INTERVAL while the cluster is quiet.
+        sleep_s = self.MIN_POLL_INTERVAL
+
         while pending:
-            time.sleep(self.POLL_INTERVAL)
+            time.sleep(sleep_s)
 
-            for job_id in list(pending):
-                lsf_id = self._lsf_ids.get(job_id)
-                if not lsf_id:
-                    continue
+            lsf_ids = [self._lsf_ids[job_id] for job_id in pending]
+            statuses = self._check_statuses(lsf_ids)
 
-                status = self._check_status(lsf_id)
+            completed_before = len(self._results)
+            for job_id in list(pending):
+                status = statuses.get(self._lsf_ids[job_id], "")
                 if status == "DONE":
                     self._results[job_id] = True
                     self._notify(job_id, True)
@@ -109,6 +187,11 @@ class LSFExecutor(Executor):
                     pending.discard(job_id)
                 # PEND, RUN, etc. -> still waiting
 
+            if len(self._results) > completed_before:
+                sleep_s = self.MIN_POLL_INTERVAL
+            else:
+                sleep_s = min(sleep_s * 2, self.POLL_INTERVAL)
+
         return dict(self._results)
 
     def cancel_all(self) -> None:
@@ -124,12 +207,21 @@ class LSFExecutor(Executor):
         return match.group(1) if match else None
 
     @staticmethod
-    def _check_status(lsf_id: str) -> str:
+    def _check_statuses(lsf_ids: List[str]) -> Dict[str, str]:
+        """Query the status of many LSF jobs with one bjobs call."""
+        if not lsf_ids:
+            return {}
         try:
             result = subprocess.run(
-                ["bjobs", "-noheader", "-o", "stat", lsf_id],
+                ["bjobs", "-noheader", "-o", "jobid stat", *lsf_ids],
                 capture_output=True, text=True,
             )
-            return result.stdout.strip()
         except Exception:
-            return "UNKNOWN"
+            return {}
+
+        statuses: Dict[str, str] = {}
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                statuses[parts[0]] = parts[1]
+        return statuses
@@ -3,12 +3,19 @@
 import csv
 import logging
 import os
-from typing import Dict, List
+import pickle
+import queue
+import threading
+from typing import Dict, List, Optional, TextIO, Tuple
 
 from kitdag.core.task import Task, TaskStatus, VariantDetail
 
 logger = logging.getLogger(__name__)
 
+# Value -> member map: cheaper than TaskStatus(value) per CSV row, and
+# malformed status strings degrade to PENDING instead of raising.
+_STATUS_BY_VALUE = {m.value: m for m in TaskStatus}
+
 
 class StateManager:
     """Manages persistent CSV state for incremental runs.
@@ -17,49 +24,251 @@ class StateManager:
         id,step_name,scope,status,input_hash,error_message,variant_details
         extract/lib=lib_a/branch=ss,extract,lib=lib_a;branch=ss,PASS,a1b2c3d4,,
         compile/lib=lib_a/branch=ss,compile,lib=lib_a;branch=ss,FAIL,9i8h7g6f,Variant check,ss_0p75v/.lib:OK;ss_0p75v/.db:FAIL
+
+    Persistence is split into a snapshot plus an append-only log:
+    ``save()`` writes the full CSV snapshot, while ``update()`` appends a
+    single row to a sidecar ``.log`` file. ``load()`` replays the log on
+    top of the snapshot (last write wins), and ``compact()`` folds the log
+    back into the snapshot. This keeps per-task status updates O(1) instead
+    of rewriting the whole file on every transition.
+
+    A pickle sidecar (``.pkl``) mirrors each snapshot and is preferred at
+    load time when at least as new as the CSV, skipping row-by-row parsing
+    on large states. The CSV stays authoritative: hand-editing it makes it
+    newer than the sidecar, so manual rerun triggers keep working.
     """
 
     STATE_FILE = "kitdag_status.csv"
     FIELDS = ["id", "step_name", "scope", "status", "input_hash",
               "error_message", "variant_details"]
 
-    def __init__(self, work_dir: str):
+    #: Max log rows coalesced into one write, and how long the writer
+    #: thread waits for more rows before flushing a partial batch.
+    FLUSH_BATCH = 256
+    FLUSH_INTERVAL_S = 0.02
+
+    def __init__(self, work_dir: str, persist: bool = True):
         self.work_dir = work_dir
+        #: With persist=False all state stays in memory: load() starts
+        #: fresh and save/update/compact never touch disk. One-shot runs
+        #: (e.g. CI) use this to drop the state layer's I/O entirely.
+        self.persist = persist
         self._state_path = os.path.join(work_dir, self.STATE_FILE)
+        self._log_path = self._state_path + ".log"
+        self._pkl_path = self._state_path + ".pkl"
+        self._log_file: Optional[TextIO] = None
+        self._queue: Optional["queue.Queue"] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
         self._tasks: Dict[str, Task] = {}
 
     @property
     def state_path(self) -> str:
         return self._state_path
 
-    def load(self) -> Dict[str, Task]:
-        """Load state from CSV file. Returns empty dict if no file exists."""
-        if not os.path.exists(self._state_path):
-            logger.info("No existing state file found, starting fresh run")
+    def load(self, compact_log: bool = False) -> Dict[str, Task]:
+        """Load state from CSV file. Returns empty dict if no file exists.
+
+        Replays the append-only log on top of the snapshot, so updates
+        from an interrupted run are not lost. With compact_log=True the
+        merged state is folded back into the snapshot and the leftover
+        log removed (owners of the state file should pass this;
+        read-only callers like the status CLI should not).
+        """
+        if not self.persist:
             return {}
 
         loaded: Dict[str, Task] = {}
-        with open(self._state_path, newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                tid = row["id"]
-                scope = _parse_scope(row.get("scope", ""))
-                variant_details = _parse_variant_details(
-                    row.get("variant_details", "")
-                )
-                task = Task(
-                    step_name=row.get("step_name", tid),
-                    scope=scope,
-                    status=TaskStatus(row.get("status", "PENDING")),
-                    input_hash=row.get("input_hash", ""),
-                    error_message=row.get("error_message", ""),
-                    variant_details=variant_details,
-                )
-                loaded[tid] = task
+        log_replayed = False
+
+        # The pickle sidecar mirrors the CSV snapshot and unpickles a
+        # whole dict at once, skipping per-row parsing on large states.
+        # The CSV stays authoritative: a hand-edited CSV is newer than
+        # the sidecar (mtime), so manual rerun triggers still work.
+        if os.path.exists(self._state_path):
+            if self._pickle_is_fresh():
+                try:
+                    with open(self._pkl_path, "rb") as f:
+                        loaded = pickle.load(f)
+                except Exception:
+                    logger.warning(
+                        "Corrupt state sidecar %s, re-parsing CSV",
+                        self._pkl_path,
+                    )
+                    loaded = {}
+            if not loaded:
+                loaded = self._load_csv_snapshot()
+
+        if os.path.exists(self._log_path):
+            log_cols = list(range(len(self.FIELDS)))
+            with open(self._log_path, newline="", buffering=1 << 20) as f:
+                for row in csv.reader(f):
+                    tid, task = _task_from_columns(row, log_cols)
+                    loaded[tid] = task
+            log_replayed = True
+
+        if compact_log and log_replayed:
+            tmp_path = self._state_path + ".tmp"
+            with open(tmp_path, "w", newline="") as f:
+                self._write_snapshot(f, loaded)
+            os.replace(tmp_path, self._state_path)
+            os.remove(self._log_path)
+            self._write_pickle(loaded)
+
+        if not loaded:
+            logger.info("No existing state file found, starting fresh run")
+            return {}
 
         logger.info("Loaded %d tasks from state file", len(loaded))
         return loaded
 
+    def _pickle_is_fresh(self) -> bool:
+        """True if the pickle sidecar is at least as new as the CSV."""
+        try:
+            return (os.path.getmtime(self._pkl_path)
+                    >= os.path.getmtime(self._state_path))
+        except OSError:
+            return False
+
+    def _load_csv_snapshot(self) -> Dict[str, Task]:
+        # Plain csv.reader with positional column slicing: DictReader
+        # allocates a dict per row, which dominates startup for large
+        # state files. The csv module is kept for quoting correctness
+        # (error messages may contain commas).
+        loaded: Dict[str, Task] = {}
+        with open(self._state_path, newline="", buffering=1 << 20) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is not None:
+                cols = [
+                    header.index(name) if name in header else -1
+                    for name in self.FIELDS
+                ]
+                for row in reader:
+                    tid, task = _task_from_columns(row, cols)
+                    loaded[tid] = task
+        return loaded
+
+    def _write_pickle(self, tasks: Dict[str, Task]) -> None:
+        tmp_path = self._pkl_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(tasks, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._pkl_path)
+
+    def update(self, task: Task) -> None:
+        """Record one task's current state: append a single log row.
+
+        Unlike save(), this does not rewrite the snapshot — it is the hot
+        path for per-task status transitions during execution. The row is
+        handed to a background writer thread so callers (e.g. executor
+        callbacks) never block on disk I/O; use flush() to wait for
+        queued rows to reach the log file.
+        """
+        self._tasks[task.id] = task
+        if not self.persist:
+            return
+        if self._writer_thread is None:
+            self._start_writer()
+        self._queue.put(_row_from_task(task))
+
+    def update_many(self, tasks: List[Task]) -> None:
+        """Record a batch of task states with one pass over the queue.
+
+        Equivalent to calling update() per task, but the rows arrive at
+        the writer thread back-to-back so they are coalesced into a
+        single write.
+        """
+        if not tasks:
+            return
+        if not self.persist:
+            for task in tasks:
+                self._tasks[task.id] = task
+            return
+        if self._writer_thread is None:
+            self._start_writer()
+        for task in tasks:
+            self._tasks[task.id] = task
+            self._queue.put(_row_from_task(task))
+
+    def flush(self) -> None:
+        """Block until all queued log rows have been written to disk."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Stop the background writer and close the log file."""
+        if self._writer_thread is not None:
+            self._queue.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+            self._queue = None
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def compact(self) -> None:
+        """Fold the append-only log into the snapshot and truncate it.
+
+        The snapshot is rewritten atomically (tmp + rename) so a crash
+        mid-compaction never loses state.
+        """
+        self.close()
+        if not self.persist:
+            return
+
+        os.makedirs(self.work_dir, exist_ok=True)
+        tmp_path = self._state_path + ".tmp"
+        with open(tmp_path, "w", newline="") as f:
+            self._write_snapshot(f, self._tasks)
+        os.replace(tmp_path, self._state_path)
+
+        if os.path.exists(self._log_path):
+            os.remove(self._log_path)
+        self._write_pickle(self._tasks)
+
+    def _start_writer(self) -> None:
+        # update()/update_many() are called from executor callback
+        # threads, so concurrent first-time updates race to start the
+        # writer; without the lock each racer would spawn its own thread
+        # holding its own append handle on the log.
+        with self._writer_lock:
+            if self._writer_thread is not None:
+                return
+            os.makedirs(self.work_dir, exist_ok=True)
+            self._log_file = open(self._log_path, "a", newline="")
+            self._queue = queue.Queue()
+            self._writer_thread = threading.Thread(
+                target=self._drain_queue, name="kitdag-state-writer",
+                daemon=True,
+            )
+            self._writer_thread.start()
+
+    def _drain_queue(self) -> None:
+        """Writer thread: coalesce queued rows into batched writes.
+
+        A None item is the shutdown sentinel posted by close().
+        """
+        writer = csv.writer(self._log_file)
+        while True:
+            row = self._queue.get()
+            batch = [row]
+            while batch[-1] is not None and len(batch) < self.FLUSH_BATCH:
+                try:
+                    batch.append(self._queue.get(timeout=self.FLUSH_INTERVAL_S))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                writer.writerows(batch)
+                self._log_file.flush()
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                return
+
     def set_tasks(self, tasks: List[Task]) -> None:
         """Set tasks directly."""
         self._tasks = {t.id: t for t in tasks}
@@ -68,24 +277,18 @@ class StateManager:
         return dict(self._tasks)
 
     def save(self) -> None:
-        """Persist current state to CSV."""
+        """Persist current state to CSV (full snapshot rewrite)."""
+        if not self.persist:
+            return
         os.makedirs(self.work_dir, exist_ok=True)
         with open(self._state_path, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
-            writer.writeheader()
-            for tid in sorted(self._tasks):
-                t = self._tasks[tid]
-                writer.writerow({
-                    "id": t.id,
-                    "step_name": t.step_name,
-                    "scope": _serialize_scope(t.scope),
-                    "status": t.status.value,
-                    "input_hash": t.input_hash,
-                    "error_message": t.error_message,
-                    "variant_details": _serialize_variant_details(
-                        t.variant_details
-                    ),
-                })
+            self._write_snapshot(f, self._tasks)
+        self._write_pickle(self._tasks)
+
+    def _write_snapshot(self, f: TextIO, tasks: Dict[str, Task]) -> None:
+        writer = csv.writer(f)
+        writer.writerow(self.FIELDS)
+        writer.writerows(_row_from_task(tasks[tid]) for tid in sorted(tasks))
 
     def summary(self) -> Dict[str, int]:
         """Return count of tasks by status."""
@@ -96,6 +299,43 @@ class StateManager:
         return counts
 
 
+def _task_from_columns(row: List[str], cols: List[int]) -> "Tuple[str, Task]":
+    """Build a Task from a raw CSV row.
+
+    ``cols`` maps each logical field (StateManager.FIELDS order) to its
+    position in the row, or -1 if the column is absent.
+    """
+    n = len(row)
+
+    def get(field_idx: int) -> str:
+        idx = cols[field_idx]
+        return row[idx] if 0 <= idx < n else ""
+
+    tid = get(0)
+    task = Task(
+        step_name=get(1) or tid,
+        scope=_parse_scope(get(2)),
+        status=_STATUS_BY_VALUE.get(get(3), TaskStatus.PENDING),
+        input_hash=get(4),
+        error_message=get(5),
+        variant_details=_parse_variant_details(get(6)),
+    )
+    return tid, task
+
+
+def _row_from_task(t: Task) -> List[str]:
+    """Serialize a task to a value list in StateManager.FIELDS order."""
+    return [
+        t.id,
+        t.step_name,
+        _serialize_scope(t.scope),
+        t.status.value,
+        t.input_hash,
+        t.error_message,
+        _serialize_variant_details(t.variant_details),
+    ]
+
+
 def _serialize_scope(scope: Dict[str, str]) -> str:
     if not scope:
         return ""
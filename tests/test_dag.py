@@ -40,6 +40,26 @@ class TestDAGBuilder(unittest.TestCase):
         with self.assertRaises(CyclicDependencyError):
             dag.topological_sort()
 
+    def test_subset_sort(self):
+        """Sorting a subset treats outside edges as satisfied."""
+        dag = DAGBuilder()
+        tasks = [Task("A"), Task("B"), Task("C")]
+        dag.add_tasks(tasks)
+        dag.set_edges({"B": {"A"}, "C": {"B"}})
+        order = dag.topological_sort(subset={"B", "C"})
+        self.assertEqual(order, ["B", "C"])
+
+    def test_critical_path_priority_order(self):
+        """Ready tasks on long chains are emitted before short ones."""
+        dag = DAGBuilder()
+        tasks = [Task("A"), Task("B"), Task("C")]
+        dag.add_tasks(tasks)
+        dag.set_edges({"B": {"A"}})
+        cpl = dag.critical_path_lengths({"A": 1.0, "B": 1.0, "C": 0.5})
+        self.assertEqual(cpl["A"], 2.0)
+        order = dag.topological_sort(priorities=cpl)
+        self.assertEqual(order, ["A", "B", "C"])
+
     def test_execution_stages(self):
         dag = DAGBuilder()
         tasks = [Task("A"), Task("B"), Task("C")]
@@ -9,6 +9,7 @@ from kitdag.core.flow import Flow
 from kitdag.core.step import Step, StepInput, StepOutput
 from kitdag.core.task import TaskStatus
 from kitdag.engine.local import LocalEngine
+from kitdag.state.manager import StateManager
 
 
 # --- Test step implementations ---
@@ -223,6 +224,23 @@ class TestVariantOutputChecking(unittest.TestCase):
             self.assertTrue(all(d.ok for d in t.variant_details))
 
 
+class TestStatePersistence(unittest.TestCase):
+
+    def test_state_file_round_trip(self):
+        """A run persists real state that a fresh StateManager can load."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pipeline, get_inputs = _build_single_step_pipeline(tmpdir, SimpleStep)
+            engine = LocalEngine(pipeline, get_inputs)
+            self.assertTrue(engine.run())
+
+            state = StateManager(work_dir=tmpdir)
+            loaded = state.load()
+            self.assertEqual(len(loaded), 1)
+            task = list(loaded.values())[0]
+            self.assertEqual(task.status, TaskStatus.PASS)
+            self.assertTrue(task.input_hash)
+
+
 class TestIncrementalRun(unittest.TestCase):
 
     def test_skip_unchanged(self):
@@ -0,0 +1,156 @@
+"""Tests for the local executor backends."""
+
+import os
+import tempfile
+import unittest
+
+from kitdag.executor import AsyncLocalExecutor, Job, LocalExecutor
+
+
+class ExecutorContractMixin:
+    """Behavior every local executor backend must provide.
+
+    Subclasses implement make_executor(); the whole matrix runs once per
+    backend (thread pool, persistent shells, asyncio).
+    """
+
+    def make_executor(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.executor = self.make_executor()
+
+    def test_submit_and_wait(self):
+        log = os.path.join(self.tmpdir, "a.log")
+        self.executor.submit(
+            Job(id="a", command=["echo", "hello"], log_path=log)
+        )
+        self.assertEqual(self.executor.wait_all(), {"a": True})
+        with open(log) as f:
+            content = f.read()
+        self.assertIn("hello", content)
+        self.assertIn("# Exit code: 0", content)
+
+    def test_failure_recorded(self):
+        self.executor.submit(Job(id="a", command=["false"]))
+        self.assertEqual(self.executor.wait_all(), {"a": False})
+
+    def test_dependency_order(self):
+        """A dependent only starts after its dependency has finished."""
+        marker = os.path.join(self.tmpdir, "marker")
+        self.executor.submit_batch([
+            Job(id="write",
+                command=["sh", "-c", f"sleep 0.1 && touch {marker}"]),
+            Job(id="check", command=["test", "-f", marker],
+                dependencies={"write"}),
+        ])
+        self.assertEqual(
+            self.executor.wait_all(), {"write": True, "check": True},
+        )
+
+    def test_failure_cascades_through_chain(self):
+        self.executor.submit_batch([
+            Job(id="a", command=["false"]),
+            Job(id="b", command=["true"], dependencies={"a"}),
+            Job(id="c", command=["true"], dependencies={"b"}),
+        ])
+        self.assertEqual(
+            self.executor.wait_all(), {"a": False, "b": False, "c": False},
+        )
+
+    def test_submit_after_failed_dependency(self):
+        """A job submitted once its dependency already failed is skipped."""
+        self.executor.submit(Job(id="a", command=["false"]))
+        self.assertEqual(self.executor.wait_all(), {"a": False})
+        self.executor.submit(
+            Job(id="late", command=["true"], dependencies={"a"})
+        )
+        self.assertFalse(self.executor.wait_all()["late"])
+
+    def test_cancel_all_completes_results(self):
+        """Cancelled jobs are recorded failed; wait_all must not hang.
+
+        Covers both a running job and a dependency-blocked one that has
+        never been scheduled.
+        """
+        self.executor.submit_batch([
+            Job(id="slow", command=["sleep", "0.3"]),
+            Job(id="dep", command=["true"], dependencies={"slow"}),
+        ])
+        self.executor.cancel_all()
+        self.assertEqual(
+            self.executor.wait_all(), {"slow": False, "dep": False},
+        )
+
+    def test_completion_callback(self):
+        seen = []
+        self.executor.set_callback(lambda jid, ok: seen.append((jid, ok)))
+        self.executor.submit_batch([
+            Job(id="ok", command=["true"]),
+            Job(id="bad", command=["false"]),
+        ])
+        self.executor.wait_all()
+        self.assertEqual(dict(seen), {"ok": True, "bad": False})
+
+
+class TestLocalExecutor(ExecutorContractMixin, unittest.TestCase):
+
+    def make_executor(self):
+        return LocalExecutor(max_workers=2)
+
+    def test_wait_subset(self):
+        self.executor.submit_batch([
+            Job(id="fast", command=["true"]),
+            Job(id="slow", command=["sleep", "0.3"]),
+        ])
+        partial = self.executor.wait({"fast"})
+        self.assertEqual(partial, {"fast": True})
+        self.assertTrue(self.executor.wait_all()["slow"])
+
+    def test_cancel_all_with_queued_futures(self):
+        """Futures cancelled while still queued are recorded failed."""
+        executor = LocalExecutor(max_workers=1)
+        # The custom cwd forces the blocking Popen path, pinning the
+        # sole worker so q1/q2 stay queued until cancel_all runs.
+        executor.submit_batch([
+            Job(id="running", command=["sleep", "0.3"], cwd=self.tmpdir),
+            Job(id="q1", command=["true"]),
+            Job(id="q2", command=["true"]),
+        ])
+        executor.cancel_all()
+        self.assertEqual(
+            executor.wait_all(),
+            {"running": False, "q1": False, "q2": False},
+        )
+
+
+class TestLocalExecutorPersistentShells(ExecutorContractMixin,
+                                        unittest.TestCase):
+
+    def make_executor(self):
+        return LocalExecutor(max_workers=2, persistent_shells=True)
+
+    def test_environment_does_not_leak_between_jobs(self):
+        self.executor.submit_batch([
+            Job(id="set", command=["sh", "-c", "test \"$MARK\" = yes"],
+                environment={"MARK": "yes"}),
+            Job(id="unset", command=["sh", "-c", "test -z \"$MARK\""],
+                dependencies={"set"}),
+        ])
+        self.assertEqual(
+            self.executor.wait_all(), {"set": True, "unset": True},
+        )
+
+
+class TestAsyncLocalExecutor(ExecutorContractMixin, unittest.TestCase):
+
+    def make_executor(self):
+        return AsyncLocalExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@
 
 import os
 import tempfile
+import threading
 import unittest
 
 from kitdag.core.task import Task, TaskStatus, VariantDetail
@@ -73,6 +74,95 @@ class TestStateManager(unittest.TestCase):
         self.assertEqual(s["PASS"], 2)
         self.assertEqual(s["FAIL"], 1)
 
+    def test_update_appends_to_log(self):
+        """update() should append to the log, not rewrite the snapshot."""
+        state = StateManager(self.tmpdir)
+        task = Task("extract", scope={"lib": "lib_a", "branch": "ss"},
+                    status=TaskStatus.PASS, input_hash="abc")
+        state.set_tasks([task])
+        state.save()
+
+        task.status = TaskStatus.FAIL
+        state.update(task)
+        state.flush()
+        self.assertTrue(os.path.exists(state.state_path + ".log"))
+
+        # A fresh manager replays the log on top of the snapshot
+        loaded = StateManager(self.tmpdir).load()
+        self.assertEqual(loaded[task.id].status, TaskStatus.FAIL)
+
+    def test_concurrent_first_updates_start_one_writer(self):
+        """Racing first-time update() calls must share a single writer.
+
+        Executor callbacks hit update() from worker threads, so the lazy
+        writer start has to be race-safe — one log row per update, none
+        lost or duplicated.
+        """
+        state = StateManager(self.tmpdir)
+        barrier = threading.Barrier(8)
+
+        def worker(i: int) -> None:
+            barrier.wait()
+            state.update(Task(f"step_{i}", status=TaskStatus.PASS))
+
+        threads = [
+            threading.Thread(target=worker, args=(i,)) for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        state.flush()
+        state.close()
+
+        with open(state.state_path + ".log") as f:
+            rows = [line for line in f if line.strip()]
+        self.assertEqual(len(rows), 8)
+        loaded = StateManager(self.tmpdir).load()
+        self.assertEqual(len(loaded), 8)
+
+    def test_compact_folds_log_into_snapshot(self):
+        state = StateManager(self.tmpdir)
+        task = Task("extract", scope={"lib": "lib_a"},
+                    status=TaskStatus.RUNNING)
+        state.update(task)
+        task.status = TaskStatus.PASS
+        state.update(task)
+        state.compact()
+
+        self.assertFalse(os.path.exists(state.state_path + ".log"))
+        loaded = StateManager(self.tmpdir).load()
+        self.assertEqual(loaded[task.id].status, TaskStatus.PASS)
+
+    def test_pickle_sidecar_written_and_csv_stays_authoritative(self):
+        state = StateManager(self.tmpdir)
+        task = Task("extract", scope={"lib": "lib_a"}, status=TaskStatus.PASS)
+        state.set_tasks([task])
+        state.save()
+        self.assertTrue(os.path.exists(state.state_path + ".pkl"))
+
+        # A hand-edited (newer) CSV wins over the stale sidecar
+        with open(state.state_path) as f:
+            contents = f.read()
+        with open(state.state_path, "w") as f:
+            f.write(contents.replace("PASS", "FAIL"))
+        past = os.path.getmtime(state.state_path) - 10
+        os.utime(state.state_path + ".pkl", (past, past))
+
+        loaded = StateManager(self.tmpdir).load()
+        self.assertEqual(loaded[task.id].status, TaskStatus.FAIL)
+
+    def test_no_persist_keeps_state_in_memory(self):
+        state = StateManager(self.tmpdir, persist=False)
+        task = Task("extract", scope={"lib": "lib_a"}, status=TaskStatus.PASS)
+        state.update(task)
+        state.save()
+        state.compact()
+
+        self.assertEqual(state.get_tasks()[task.id].status, TaskStatus.PASS)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+        self.assertEqual(StateManager(self.tmpdir).load(), {})
+
     def test_per_lib_task(self):
         """Task with only lib scope (no branch)."""
         state = StateManager(self.tmpdir)